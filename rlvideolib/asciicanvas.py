@@ -2,27 +2,44 @@ class AsciiCanvas:
 
     def __init__(self):
         self.chars = {}
+        self.max_x = 0
+        self.max_y = 0
 
     def get_max_x(self):
         """
         >>> AsciiCanvas().get_max_x()
         0
+
+        >>> canvas = AsciiCanvas()
+        >>> canvas.add_text("hello", 2, 3)
+        >>> canvas.get_max_x(), canvas.get_max_y()
+        (6, 3)
         """
-        if self.chars:
-            return max(x for (x, y) in self.chars.keys())
-        else:
-            return 0
+        return self.max_x
 
     def get_max_y(self):
-        if self.chars:
-            return max(y for (x, y) in self.chars.keys())
-        else:
-            return 0
+        return self.max_y
 
     def add_text(self, text, x, y):
         for index, char in enumerate(text):
             self.add_char(x+index, y, char)
 
+    def add_vertical_line(self, char, x, height):
+        """
+        >>> canvas = AsciiCanvas()
+        >>> canvas.add_vertical_line("|", 2, 3)
+        >>> print(repr(canvas))
+          |
+          |
+          |
+        >>> canvas.get_max_x(), canvas.get_max_y()
+        (2, 2)
+        """
+        if height > 0:
+            self.add_char(x, height-1, char)
+            for y in range(height-1):
+                self.chars[(x, y)] = char
+
     def add_canvas(self, canvas, dx=0, dy=0):
         for (x, y), value in canvas.chars.items():
             self.add_char(x+dx, y+dy, value)
@@ -44,18 +61,28 @@ class AsciiCanvas:
         if len(char) != 1:
             raise ValueError(f"Invalid ascii char {char!r} at ({x}, {y}): length is not 1.")
         self.chars[(x, y)] = char
+        self.max_x = max(self.max_x, x)
+        self.max_y = max(self.max_y, y)
 
     def __repr__(self):
+        """
+        >>> canvas = AsciiCanvas()
+        >>> canvas.add_text("ab", 1, 0)
+        >>> canvas.add_text("c", 0, 2)
+        >>> print(repr(canvas))
+         ab
+        <BLANKLINE>
+        c
+        """
         lines = []
         if self.chars:
-            max_y = max(y for (x, y) in self.chars.keys())
-            for y in range(max_y+1):
-                chars_for_y = {}
-                for (x2, y2), char in self.chars.items():
-                    if y2 == y:
-                        chars_for_y[x2] = char
+            rows = {}
+            for (x, y), char in self.chars.items():
+                rows.setdefault(y, {})[x] = char
+            for y in range(max(rows)+1):
+                chars_for_y = rows.get(y, {})
                 if chars_for_y:
-                    max_x = max(x for x in chars_for_y.keys())
+                    max_x = max(chars_for_y.keys())
                     lines.append("".join([
                         chars_for_y.get(x, " ")
                         for x in range(max_x+1)
@@ -1,8 +1,12 @@
+import json
 import os
 import subprocess
+import tempfile
 
 import mlt
 
+LENGTH_CACHE = {}
+
 class Clip:
 
     def __init__(self, path):
@@ -12,11 +16,76 @@ class Clip:
         return subprocess.check_output(["md5sum", self.path])[:32].decode("ascii")
 
     def calculate_length_at_fps(self, mlt_profile):
-        return mlt.Producer(mlt_profile, self.path).get_playtime()
+        """
+        Probing a file with MLT is slow, so the length is cached as long as
+        the file is not modified:
+
+        >>> _ = mlt.Factory().init()
+        >>> profile = mlt.Profile("uhd_2160p_25")
+        >>> clip = Clip("resources/one.mp4")
+        >>> saved_cache = dict(LENGTH_CACHE)
+        >>> LENGTH_CACHE.clear()
+        >>> length = clip.calculate_length_at_fps(profile)
+        >>> key = clip.get_length_cache_key(profile)
+        >>> LENGTH_CACHE[key] == length
+        True
+
+        The next call returns the cached length without probing the file:
+
+        >>> LENGTH_CACHE[key] = "cached length"
+        >>> clip.calculate_length_at_fps(profile)
+        'cached length'
+
+        >>> LENGTH_CACHE.clear()
+        >>> LENGTH_CACHE.update(saved_cache)
+        """
+        if not os.path.exists(self.path):
+            return mlt.Producer(mlt_profile, self.path).get_playtime()
+        key = self.get_length_cache_key(mlt_profile)
+        if key not in LENGTH_CACHE:
+            LENGTH_CACHE[key] = mlt.Producer(mlt_profile, self.path).get_playtime()
+        return LENGTH_CACHE[key]
+
+    def get_checksum(self, proxy_spec):
+        """
+        Calculating the checksum reads the whole file, so it is stored next
+        to the proxies and reused as long as the file is not modified:
+
+        >>> tmp = tempfile.TemporaryDirectory()
+        >>> path = os.path.join(tmp.name, "clip.txt")
+        >>> with open(path, "w") as f:
+        ...     _ = f.write("hello")
+        >>> proxy_spec = ProxySpec(dir=os.path.join(tmp.name, ".cache"))
+        >>> Clip(path).get_checksum(proxy_spec)
+        '5d41402abc4b2a76b9719d911017c592'
+        >>> proxy_spec.load_checksums()[Clip(path).get_checksum_cache_key()]
+        '5d41402abc4b2a76b9719d911017c592'
+        """
+        key = self.get_checksum_cache_key()
+        checksums = proxy_spec.load_checksums()
+        if key not in checksums:
+            checksums[key] = self.md5()
+            proxy_spec.save_checksums(checksums)
+        return checksums[key]
+
+    def get_checksum_cache_key(self):
+        return "{}:{}:{}".format(
+            os.path.abspath(self.path),
+            os.path.getsize(self.path),
+            os.path.getmtime(self.path),
+        )
+
+    def get_length_cache_key(self, mlt_profile):
+        return (
+            os.path.abspath(self.path),
+            os.path.getmtime(self.path),
+            mlt_profile.frame_rate_num(),
+            mlt_profile.frame_rate_den(),
+        )
 
     def generate_proxy(self, proxy_spec, progress):
         # TODO: call progress
-        checksum = self.md5()
+        checksum = self.get_checksum(proxy_spec)
         proxy_path = proxy_spec.get_path(checksum)
         proxy_tmp_path = proxy_spec.get_tmp_path(checksum)
         if not os.path.exists(proxy_path):
@@ -85,6 +154,39 @@ class ProxySpec:
     def get_path(self, name):
         return os.path.join(self.dir, f"{name}.{self.extension}")
 
+    def get_checksums_path(self):
+        """
+        >>> ProxySpec().get_checksums_path()
+        '/tmp/checksums.json'
+        """
+        return os.path.join(self.dir, "checksums.json")
+
+    def load_checksums(self):
+        try:
+            with open(self.get_checksums_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_checksums(self, checksums):
+        """
+        The checksums file is only a cache, so failing to write it is not an
+        error:
+
+        >>> tmp = tempfile.TemporaryDirectory()
+        >>> not_a_dir = os.path.join(tmp.name, "file")
+        >>> open(not_a_dir, "w").close()
+        >>> ProxySpec(dir=os.path.join(not_a_dir, ".cache")).save_checksums({})
+        """
+        try:
+            self.ensure_dir()
+            tmp_path = self.get_checksums_path() + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(checksums, f)
+            os.rename(tmp_path, self.get_checksums_path())
+        except OSError:
+            pass
+
     def ensure_dir(self):
         if not os.path.exists(self.dir):
             os.mkdir(self.dir)
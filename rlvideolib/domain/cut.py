@@ -1,4 +1,6 @@
 from collections import namedtuple
+from functools import cached_property
+import heapq
 import itertools
 import uuid
 
@@ -150,7 +152,7 @@ class Cut(namedtuple("Cut", "source,in_out,position,id,mix_strategy,volume,speed
     def get_region_groups(self, group_size):
         """
         >>> Cut.test_instance(start=0, end=10).get_region_groups(5)
-        {0, 1}
+        range(0, 2)
         """
         return self.region.get_groups(group_size)
 
@@ -305,6 +307,11 @@ class Cut(namedtuple("Cut", "source,in_out,position,id,mix_strategy,volume,speed
         >>> Cut.test_instance(name="A", start=0, end=5, position=0).to_ascii_canvas()
         #####
         """
+        canvas = AsciiCanvas()
+        canvas.add_text(self.to_ascii_text(), 0, 0)
+        return canvas
+
+    def to_ascii_text(self):
         if self.starts_at_original_cut():
             start_marker = "<-"
         else:
@@ -321,9 +328,7 @@ class Cut(namedtuple("Cut", "source,in_out,position,id,mix_strategy,volume,speed
         text += end_marker
         if len(text) != self.length:
             text = "#"*self.length
-        canvas = AsciiCanvas()
-        canvas.add_text(text, 0, 0)
-        return canvas
+        return text
 
     def add_to_mlt_playlist(self, profile, cache, playlist):
         playlist.append(self.to_mlt_producer(profile, cache))
@@ -350,8 +355,9 @@ class Cut(namedtuple("Cut", "source,in_out,position,id,mix_strategy,volume,speed
         boxes[self.get_source_cut()].append(rectangle)
 
     def draw_cairo(self, context, rectangles, rectangle_map, project, scrollbar, player):
+        cut_rectangles = CutRectangles(rectangles)
         context.save()
-        CutRectangles(rectangles).cairo_fill_path(context)
+        cut_rectangles.cairo_fill_path(context)
         context.clip_preserve()
         context.set_source_rgb(0.9, 0.2, 0.2)
         context.fill()
@@ -360,7 +366,7 @@ class Cut(namedtuple("Cut", "source,in_out,position,id,mix_strategy,volume,speed
         context.text_path(project.get_label(self.get_source_id()))
         context.fill()
         context.restore()
-        CutRectangles(rectangles).cairo_stroke_path(context, 2)
+        cut_rectangles.cairo_stroke_path(context, 2)
         context.set_source_rgba(0.1, 0.1, 0.1)
         context.stroke()
         for rectangle in rectangles:
@@ -648,8 +654,7 @@ class SpaceCut(namedtuple("SpaceCut", "length")):
         return canvas
 
     def add_to_mlt_playlist(self, profile, cache, playlist):
-        producer = mlt.Producer(profile, "color:#00000000") # transparent
-        playlist.append(producer.cut(0, self.length-1))
+        playlist.append(cache.get_space_mlt_producer(profile).cut(0, self.length-1))
 
     def collect_cut_boxes(self, region, boxes, rectangle, pos):
         pass
@@ -657,7 +662,7 @@ class SpaceCut(namedtuple("SpaceCut", "length")):
     def draw_cairo(self, context, rectangle, rectangle_map, project):
         pass
 
-class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
+class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size,end")):
 
     """
     >>> a = Cut.test_instance(name="A", start=0, end=20, position=0, id=0)
@@ -706,10 +711,10 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
 
     @staticmethod
     def from_json(json):
-        cuts = Cuts.empty()
-        for id, json in json.items():
-            cuts = cuts.add(Cut.from_json(id, json))
-        return cuts
+        return Cuts.empty().add(*[
+            Cut.from_json(id, cut_json)
+            for id, cut_json in json.items()
+        ])
 
     @staticmethod
     def from_list(cuts):
@@ -723,7 +728,8 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         return Cuts(
             cut_map={},
             region_to_cuts=RegionToCuts.empty(),
-            region_group_size=DEFAULT_REGION_GROUP_SIZE
+            region_group_size=DEFAULT_REGION_GROUP_SIZE,
+            end=0
         )
 
     def to_json(self):
@@ -735,6 +741,22 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
     def get(self, id):
         return self.cut_map[id]
 
+    def get_source_ids(self):
+        """
+        Source ids in the order they first appear on the timeline:
+
+        >>> Cuts.from_list([
+        ...     Cut.test_instance(name="A", position=10),
+        ...     Cut.test_instance(name="B", position=5),
+        ...     Cut.test_instance(name="A", position=0),
+        ...     Cut.test_instance(name="C", position=20),
+        ... ]).get_source_ids()
+        ['A', 'B', 'C']
+        """
+        return list(dict.fromkeys(
+            cut.get_source_id() for cut in self.sorted_cuts
+        ))
+
     def has_overlap_with_cut(self, cut):
         """
         >>> cut = Cut.test_instance()
@@ -762,22 +784,17 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         >>> list(cuts.cut_map.keys())
         ['a']
         >>> cuts.region_to_cuts
-        RegionToCuts(region_number_to_cut_ids={0: ['a']})
+        RegionToCuts(region_number_to_cut_ids={0: {'a': None}})
+
+        >>> cuts.add() is cuts
+        True
         """
-        new_region_to_cuts = self.region_to_cuts
-        new_cuts = dict(self.cut_map)
+        if not cuts:
+            return self
+        builder = CutsBuilder(self)
         for cut in cuts:
-            if cut.id in new_cuts:
-                raise ValueError(f"Cut with id = {cut.id} already exists.")
-            new_region_to_cuts = new_region_to_cuts.add_cut_to_regions(
-                cut.id,
-                cut.get_region_groups(self.region_group_size)
-            )
-            new_cuts[cut.id] = cut
-        return self._replace(
-            cut_map=new_cuts,
-            region_to_cuts=new_region_to_cuts,
-        )
+            builder.add(cut)
+        return builder.build()
 
     def remove(self, cut_id):
         """
@@ -787,56 +804,36 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         >>> list(cuts.cut_map.keys())
         ['a', 'b']
         >>> cuts.region_to_cuts
-        RegionToCuts(region_number_to_cut_ids={0: ['a', 'b']})
+        RegionToCuts(region_number_to_cut_ids={0: {'a': None, 'b': None}})
 
         >>> cuts = cuts.remove("b")
         >>> list(cuts.cut_map.keys())
         ['a']
         >>> cuts.region_to_cuts
-        RegionToCuts(region_number_to_cut_ids={0: ['a']})
+        RegionToCuts(region_number_to_cut_ids={0: {'a': None}})
         """
-        old_cut = self.cut_map[cut_id]
-        new_cuts = dict(self.cut_map)
-        del new_cuts[cut_id]
-        return self._replace(
-            cut_map=new_cuts,
-            region_to_cuts=self.region_to_cuts.remove_cut_from_regions(
-                cut_id,
-                old_cut.get_region_groups(self.region_group_size)
-            ),
-        )
+        builder = CutsBuilder(self)
+        builder.remove(cut_id)
+        return builder.build()
 
     def modify(self, cut_id, fn):
         """
         >>> cuts = Cuts.empty()
         >>> cuts = cuts.add(Cut.test_instance(start=0, end=1, id="a"))
         >>> cuts.region_to_cuts
-        RegionToCuts(region_number_to_cut_ids={0: ['a']})
+        RegionToCuts(region_number_to_cut_ids={0: {'a': None}})
         >>> cuts = cuts.modify("a", lambda cut: cut.move(DEFAULT_REGION_GROUP_SIZE))
         >>> cuts.region_to_cuts
-        RegionToCuts(region_number_to_cut_ids={0: [], 1: ['a']})
+        RegionToCuts(region_number_to_cut_ids={0: {}, 1: {'a': None}})
 
         >>> cuts.modify("non-existing-id", lambda cut: cut)
         Traceback (most recent call last):
           ...
         ValueError: cut with id non-existing-id does not exist.
         """
-        if cut_id not in self.cut_map:
-            raise ValueError(f"cut with id {cut_id} does not exist.")
-        old_cut = self.cut_map[cut_id]
-        new_cut = fn(old_cut)
-        new_cuts = dict(self.cut_map)
-        new_cuts[cut_id] = new_cut
-        return self._replace(
-            cut_map=new_cuts,
-            region_to_cuts=self.region_to_cuts.remove_cut_from_regions(
-                old_cut.id,
-                old_cut.get_region_groups(self.region_group_size)
-            ).add_cut_to_regions(
-                new_cut.id,
-                new_cut.get_region_groups(self.region_group_size)
-            ),
-        )
+        builder = CutsBuilder(self)
+        builder.modify(cut_id, fn)
+        return builder.build()
 
     def ripple_delete(self, cut_id):
         """
@@ -884,19 +881,18 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         |<-A0->   |
         |   <-C0->|
         """
-        cut_to_delete = self.get(cut_id)
-        cuts = self
-        cuts = cuts.remove(cut_id)
+        builder = CutsBuilder(self)
+        cut_to_delete = builder.remove(cut_id)
         ids = []
         diffs = []
-        for cut in cuts.cut_map.values():
+        for cut in builder.cut_map.values():
             if cut.start > cut_to_delete.start:
                 ids.append(cut.id)
                 diffs.append(cut.start-cut_to_delete.start)
         delta = -min(diffs)
         for id in ids:
-            cuts = cuts.modify(id, lambda cut: cut.move(delta))
-        return cuts
+            builder.modify(id, lambda cut: cut.move(delta))
+        return builder.build()
 
     def split(self, cut_id, position):
         """
@@ -912,20 +908,19 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         |          <-A0->              |
         |                <-A6--------->|
         """
-        cut_to_split = self.get(cut_id)
-        cuts = self
-        cuts = cuts.remove(cut_to_split.id)
+        builder = CutsBuilder(self)
+        cut_to_split = builder.remove(cut_id)
         for new in cut_to_split.split(position):
-            cuts = cuts.add(new)
-        return cuts
+            builder.add(new)
+        return builder.build()
 
     def yield_cuts_in_period(self, period):
-        yielded = set()
-        for group in period.get_groups(self.region_group_size):
-            for cut_id in self.region_to_cuts.get_cuts_in_region(group):
-                if cut_id not in yielded:
-                    yield self.cut_map[cut_id]
-                    yielded.add(cut_id)
+        for cut_id in dict.fromkeys(itertools.chain.from_iterable(
+            self.region_to_cuts.get_cuts_in_regions(
+                period.get_groups(self.region_group_size)
+            )
+        )):
+            yield self.cut_map[cut_id]
 
     def create_cut(self, period):
         """
@@ -940,12 +935,15 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         |  -A2-->     |
         |     <-B0--->|
         """
+        return Cuts.empty().add(*self.create_cuts_in_period(period))
+
+    def create_cuts_in_period(self, period):
         cuts = []
         for cut in self.yield_cuts_in_period(period):
             sub_cut = cut.create_cut(period)
             if sub_cut:
                 cuts.append(sub_cut)
-        return Cuts.empty().add(*cuts)
+        return cuts
 
     def split_into_sections(self):
         """
@@ -1005,9 +1003,36 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         |<-B0------|-B10----->|-C10-----><-A0--------------->|
         |          |<-C0------|                              |
         """
+        return self.sections
+
+    @cached_property
+    def sections(self):
+        """
+        Cuts are immutable, so the sections are only calculated once per
+        instance:
+
+        >>> cuts = Cuts.from_list([Cut.test_instance(id="a")])
+        >>> cuts.split_into_sections() is cuts.split_into_sections()
+        True
+        >>> cuts.split_into_sections() is cuts.modify(
+        ...     list(cuts.cut_map.keys())[0],
+        ...     lambda cut: cut.move(1)
+        ... ).split_into_sections()
+        False
+        """
         sections = Sections()
+        overlaps = list(self.get_regions_with_overlap())
+        if not overlaps:
+            # All cuts fit in a single playlist section, so there is no need
+            # to look them up by region.
+            if self.cut_map:
+                sections.add(Cuts.create_playlist_section(
+                    Region(start=0, end=self.end),
+                    self.sorted_cuts
+                ))
+            return sections
         start = 0
-        for overlap in self.get_regions_with_overlap():
+        for overlap in overlaps:
             if overlap.start > start:
                 sections.add(self.extract_playlist_section(Region(
                     start=start,
@@ -1034,10 +1059,19 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         >>> cuts.extract_playlist_section(Region(start=0, end=20)).to_ascii_canvas()
         %<-A0--->%<-B0--->%%
         """
+        # Cuts are found in region group order, so they are almost sorted
+        # already.
+        return Cuts.create_playlist_section(
+            region,
+            sorted(self.create_cuts_in_period(region), key=lambda cut: cut.start)
+        )
+
+    @staticmethod
+    def create_playlist_section(region, sorted_cuts):
         # TODO: test value errors
         parts = []
         start = region.start
-        for cut in sorted(self.create_cut(region).cut_map.values(), key=lambda cut: cut.start):
+        for cut in sorted_cuts:
             if cut.start > start:
                 parts.append(SpaceCut(cut.start-start))
             elif cut.start < start:
@@ -1096,46 +1130,84 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         <-B0-->%%%
         """
         playlists = []
-        for cut in self.sort_cuts(self.create_cut(region).cut_map.values()):
-            playlists.append(Cuts.empty().add(cut).extract_playlist_section(region))
+        for cut in self.sort_cuts(self.create_cuts_in_period(region)):
+            playlists.append(Cuts.create_playlist_section(region, [cut]))
         return MixSection(length=region.length, playlists=playlists)
 
     def sort_cuts(self, cuts):
-        sorted_cuts = []
+        """
+        Later "over" cuts are placed on top of earlier ones:
+
+        >>> [cut.get_source_id() for cut in Cuts.empty().sort_cuts([
+        ...     Cut.test_instance(name="A", position=0, mix_strategy="over"),
+        ...     Cut.test_instance(name="B", position=1, mix_strategy="under"),
+        ...     Cut.test_instance(name="C", position=2, mix_strategy="over"),
+        ...     Cut.test_instance(name="D", position=3, mix_strategy="under"),
+        ... ])]
+        ['C', 'A', 'B', 'D']
+        """
+        over_cuts = []
+        under_cuts = []
         for cut in sorted(cuts, key=lambda cut: (
             cut.get_source_cut().start,
             cut.get_source_cut().end
         )):
             if cut.mix_strategy == "over":
-                sorted_cuts.insert(0, cut)
+                over_cuts.append(cut)
             else:
                 assert cut.mix_strategy == "under"
-                sorted_cuts.append(cut)
-        return sorted_cuts
+                under_cuts.append(cut)
+        over_cuts.reverse()
+        return over_cuts + under_cuts
+
+    @cached_property
+    def sorted_cuts(self):
+        """
+        Cuts sorted by start. Calculated once per instance and shared by the
+        overlap sweep and the section extraction.
+
+        >>> [cut.start for cut in Cuts.from_list([
+        ...     Cut.test_instance(position=10),
+        ...     Cut.test_instance(position=0),
+        ...     Cut.test_instance(position=5),
+        ... ]).sorted_cuts]
+        [0, 5, 10]
+        """
+        return sorted(self.cut_map.values(), key=lambda cut: cut.start)
 
     @timeit("Cuts.get_regions_with_overlap")
     def get_regions_with_overlap(self):
+        """
+        >>> list(Cuts.from_list([
+        ...     Cut.test_instance(start=0, end=10, position=0),
+        ...     Cut.test_instance(start=0, end=10, position=5),
+        ...     Cut.test_instance(start=0, end=10, position=20),
+        ...     Cut.test_instance(start=0, end=2, position=22),
+        ...     Cut.test_instance(start=0, end=10, position=30),
+        ... ]).get_regions_with_overlap())
+        [Region(start=5, end=10), Region(start=22, end=24)]
+        """
         overlaps = UnionRegions()
-        for cut_ids in self.region_to_cuts.iter_groups():
-            for (id1, id2) in itertools.combinations(cut_ids, 2):
-                overlap = self.cut_map[id1].get_overlap(self.cut_map[id2])
-                if overlap:
-                    overlaps.add(overlap)
+        for overlap in self.sweep_overlaps():
+            overlaps.add(overlap)
         return overlaps
 
-    @property
-    def end(self):
+    def sweep_overlaps(self):
         """
-        >>> Cuts.empty().end
-        0
+        Sweep cuts in start order while keeping the cuts that are still active
+        (not yet ended) in a heap ordered by end. Only cuts that are active
+        when a new cut starts can overlap with it.
 
-        >>> Cuts.from_list([Cut.test_instance(start=0, end=5, position=5)]).end
-        10
+        Since all active cuts start at or before the new cut and end after its
+        start, the overlap is calculated from the ends alone.
         """
-        if self.cut_map:
-            return max(cut.end for cut in self.cut_map.values())
-        else:
-            return 0
+        active_ends = []
+        for start, end in ((cut.start, cut.end) for cut in self.sorted_cuts):
+            while active_ends and active_ends[0] <= start:
+                heapq.heappop(active_ends)
+            for active_end in active_ends:
+                yield Region(start=start, end=min(end, active_end))
+            heapq.heappush(active_ends, end)
 
     def to_ascii_canvas(self):
         """
@@ -1150,11 +1222,11 @@ class Cuts(namedtuple("Cuts", "cut_map,region_to_cuts,region_group_size")):
         """
         canvas = AsciiCanvas()
         for y, cut in enumerate(self.cut_map.values()):
-            canvas.add_canvas(cut.to_ascii_canvas(), dy=y, dx=cut.start+1)
-        x = canvas.get_max_x()+1
-        for y in range(len(self.cut_map)):
-            canvas.add_text("|", 0, y)
-            canvas.add_text("|", x, y)
+            canvas.add_text(
+                "|"+" "*cut.start+cut.to_ascii_text()+" "*(self.end-cut.end)+"|",
+                0,
+                y
+            )
         return canvas
 
 class RegionToCuts(namedtuple("RegionToCuts", "region_number_to_cut_ids")):
@@ -1167,43 +1239,162 @@ class RegionToCuts(namedtuple("RegionToCuts", "region_number_to_cut_ids")):
         """
         return RegionToCuts({})
 
-    def iter_groups(self):
-        return iter(self.region_number_to_cut_ids.values())
-
-    def add_cut_to_regions(self, cut_id, group_numbers):
+    def get_cuts_in_region(self, region_number):
         """
-        >>> RegionToCuts.empty().add_cut_to_regions(5, [1, 2, 3])
-        RegionToCuts(region_number_to_cut_ids={1: [5], 2: [5], 3: [5]})
+        >>> list(RegionToCuts.empty().get_cuts_in_region(5))
+        []
+
+        >>> list(RegionToCuts({1: {5: None}}).get_cuts_in_region(1))
+        [5]
         """
-        new_region_to_cuts = dict(self.region_number_to_cut_ids)
-        for region_number in group_numbers:
-            new_ids = new_region_to_cuts.get(region_number, [])
-            if cut_id not in new_ids:
-                new_ids = new_ids + [cut_id]
-            new_region_to_cuts[region_number] = new_ids
-        return self._replace(region_number_to_cut_ids=new_region_to_cuts)
+        return self.region_number_to_cut_ids.get(region_number, {}).keys()
 
-    def remove_cut_from_regions(self, cut_id, group_numbers):
+    def get_cuts_in_regions(self, region_numbers):
         """
-        >>> RegionToCuts.empty().add_cut_to_regions(5, [1, 2, 3]).remove_cut_from_regions(5, [1])
-        RegionToCuts(region_number_to_cut_ids={1: [], 2: [5], 3: [5]})
+        Only stored regions are visited if there are fewer of them than
+        requested region numbers:
+
+        >>> region_to_cuts = RegionToCuts({1: {5: None}, 1000: {6: None}})
+        >>> [list(x) for x in region_to_cuts.get_cuts_in_regions({1, 2})]
+        [[5], []]
+        >>> [list(x) for x in region_to_cuts.get_cuts_in_regions(range(0, 2000))]
+        [[5], [6]]
         """
-        new_region_to_cuts = dict(self.region_number_to_cut_ids)
-        for region_number in group_numbers:
-            new_ids = list(new_region_to_cuts[region_number])
-            new_ids.remove(cut_id)
-            new_region_to_cuts[region_number] = new_ids
-        return self._replace(region_number_to_cut_ids=new_region_to_cuts)
+        if len(region_numbers) > len(self.region_number_to_cut_ids):
+            for region_number, cut_ids in self.region_number_to_cut_ids.items():
+                if region_number in region_numbers:
+                    yield cut_ids.keys()
+        else:
+            for region_number in region_numbers:
+                yield self.get_cuts_in_region(region_number)
 
-    def get_cuts_in_region(self, region_number):
+class CutsBuilder:
+
+    """
+    A mutable copy of a Cuts that many changes can be applied to before a new
+    Cuts is built. The cut map and the region index are only copied once per
+    builder, and region groups are only copied the first time they change.
+    The builder should not be used after build has been called.
+
+    The end is only recalculated if the cut defining it is removed or
+    modified:
+
+    >>> cuts = Cuts.empty()
+    >>> cuts.end
+    0
+    >>> cuts = cuts.add(Cut.test_instance(start=0, end=5, position=5, id="a"))
+    >>> cuts = cuts.add(Cut.test_instance(start=0, end=5, position=0, id="b"))
+    >>> cuts.end
+    10
+    >>> cuts.modify("a", lambda cut: cut.move(-5)).end
+    5
+    >>> cuts.modify("b", lambda cut: cut.move(10)).end
+    15
+    >>> cuts.remove("b").end
+    10
+    >>> cuts.remove("a").end
+    5
+    >>> cuts.remove("a").remove("b").end
+    0
+
+    The cuts that the builder was created from are left untouched:
+
+    >>> builder = CutsBuilder(cuts)
+    >>> builder.add(Cut.test_instance(start=0, end=5, position=0, id="c"))
+    >>> builder.build().region_to_cuts
+    RegionToCuts(region_number_to_cut_ids={0: {'a': None, 'b': None, 'c': None}})
+    >>> cuts.region_to_cuts
+    RegionToCuts(region_number_to_cut_ids={0: {'a': None, 'b': None}})
+    """
+
+    def __init__(self, cuts):
+        self.cuts = cuts
+        self.cut_map = dict(cuts.cut_map)
+        self.region_number_to_cut_ids = None
+        self.copied_region_numbers = set()
+        self.end = cuts.end
+
+    def add(self, cut):
+        if cut.id in self.cut_map:
+            raise ValueError(f"Cut with id = {cut.id} already exists.")
+        self.cut_map[cut.id] = cut
+        self.add_to_regions(cut.id, self.get_region_groups(cut))
+        self.update_end_added(cut)
+
+    def remove(self, cut_id):
+        old_cut = self.cut_map.pop(cut_id)
+        self.remove_from_regions(cut_id, self.get_region_groups(old_cut))
+        self.update_end_removed(old_cut)
+        return old_cut
+
+    def modify(self, cut_id, fn):
         """
-        >>> RegionToCuts.empty().get_cuts_in_region(5)
-        []
+        The region index is left untouched if the cut stays in the same region
+        groups:
 
-        >>> RegionToCuts.empty().add_cut_to_regions(5, [1]).get_cuts_in_region(1)
-        [5]
+        >>> cuts = Cuts.empty().add(Cut.test_instance(id="a"))
+        >>> builder = CutsBuilder(cuts)
+        >>> builder.modify("a", lambda cut: cut.with_volume(5))
+        >>> builder.build().region_to_cuts is cuts.region_to_cuts
+        True
         """
-        return self.region_number_to_cut_ids.get(region_number, [])
+        if cut_id not in self.cut_map:
+            raise ValueError(f"cut with id {cut_id} does not exist.")
+        old_cut = self.cut_map[cut_id]
+        new_cut = fn(old_cut)
+        self.cut_map[cut_id] = new_cut
+        old_groups = self.get_region_groups(old_cut)
+        new_groups = self.get_region_groups(new_cut)
+        if old_cut.id != new_cut.id or old_groups != new_groups:
+            self.remove_from_regions(old_cut.id, old_groups)
+            self.add_to_regions(new_cut.id, new_groups)
+        self.update_end_removed(old_cut)
+        self.update_end_added(new_cut)
+
+    def get_region_groups(self, cut):
+        return cut.get_region_groups(self.cuts.region_group_size)
+
+    def add_to_regions(self, cut_id, region_numbers):
+        for region_number in region_numbers:
+            self.get_cut_ids_to_modify(region_number)[cut_id] = None
+
+    def remove_from_regions(self, cut_id, region_numbers):
+        for region_number in region_numbers:
+            del self.get_cut_ids_to_modify(region_number)[cut_id]
+
+    def get_cut_ids_to_modify(self, region_number):
+        # Cut ids are stored as keys in dicts to get insertion ordered sets.
+        if self.region_number_to_cut_ids is None:
+            self.region_number_to_cut_ids = dict(
+                self.cuts.region_to_cuts.region_number_to_cut_ids
+            )
+        if region_number not in self.copied_region_numbers:
+            self.region_number_to_cut_ids[region_number] = dict(
+                self.region_number_to_cut_ids.get(region_number, {})
+            )
+            self.copied_region_numbers.add(region_number)
+        return self.region_number_to_cut_ids[region_number]
+
+    def update_end_added(self, cut):
+        if self.end is not None:
+            self.end = max(self.end, cut.end)
+
+    def update_end_removed(self, cut):
+        if self.end is not None and cut.end >= self.end:
+            self.end = None
+
+    def build(self):
+        if self.end is None:
+            self.end = max((cut.end for cut in self.cut_map.values()), default=0)
+        if self.region_number_to_cut_ids is None:
+            region_to_cuts = self.cuts.region_to_cuts
+        else:
+            region_to_cuts = RegionToCuts(self.region_number_to_cut_ids)
+        return self.cuts._replace(
+            cut_map=self.cut_map,
+            region_to_cuts=region_to_cuts,
+            end=self.end,
+        )
 
 class CutSource(namedtuple("CutSource", "source_id")):
 
@@ -1227,11 +1418,12 @@ class CutRectangles:
 
     def __init__(self, rectangles):
         self.rectangles = rectangles
+        self.segments = list(self.get_segments(7))
 
     def cairo_fill_path(self, context):
         def curve(endx, endy, x, y):
             context.curve_to(endx, endy, x, y, x, y)
-        for index, (x1, y1, x2, y2, endx, endy) in enumerate(self.get_segments(7)):
+        for index, (x1, y1, x2, y2, endx, endy) in enumerate(self.segments):
             if index == 0:
                 start = (x1, y1)
                 context.move_to(x1, y1)
@@ -1268,15 +1460,24 @@ class CutRectangles:
             last = point
 
     def get_corner_points(self):
-        def add(point):
-            if point != points[-1]:
-                points.append(point)
-        start = (self.rectangles[0].left, self.rectangles[0].top)
-        points = [start]
-        for r in self.rectangles:
-            add((r.left, r.bottom))
-            add((r.right, r.bottom))
-        for r in reversed(self.rectangles):
-            add((r.right, r.top))
-            add((r.left, r.top))
-        return points
+        """
+        >>> CutRectangles([
+        ...     Rectangle(x=0, y=0, width=10, height=10),
+        ...     Rectangle(x=10, y=5, width=10, height=5),
+        ... ]).get_corner_points()
+        [(0, 0), (0, 10), (10, 10), (20, 10), (20, 5), (10, 5), (10, 0), (0, 0)]
+        """
+        candidates = [(self.rectangles[0].left, self.rectangles[0].top)]
+        candidates.extend(itertools.chain.from_iterable(
+            ((r.left, r.bottom), (r.right, r.bottom))
+            for r in self.rectangles
+        ))
+        candidates.extend(itertools.chain.from_iterable(
+            ((r.right, r.top), (r.left, r.top))
+            for r in reversed(self.rectangles)
+        ))
+        return candidates[:1] + [
+            point
+            for previous, point in zip(candidates, candidates[1:])
+            if point != previous
+        ]
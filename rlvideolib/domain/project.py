@@ -3,10 +3,14 @@ import contextlib
 import json
 import os
 import tempfile
-import time
 
 import mlt
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from rlvideolib.debug import timeit
 from rlvideolib.domain.clip import Clip
 from rlvideolib.domain.clip import ProxySpec
@@ -19,6 +23,8 @@ from rlvideolib.domain.source import TextSource
 from rlvideolib.events import Event
 from rlvideolib.jobs import NonThreadedBackgroundWorker
 from rlvideolib.mlthelpers import LoadingProducer
+from rlvideolib.mlthelpers import SpaceProducer
+from rlvideolib.mlthelpers import start_consumer
 from rlvideolib.testing import capture_stdout_stderr
 from rlvideolib.testing import doctest_equal
 
@@ -52,6 +58,21 @@ class Project:
 
     @staticmethod
     def load(args, background_worker=None):
+        """
+        Sources in a loaded project start loading when the project is opened,
+        not when it is constructed:
+
+        >>> class PrintingWorker:
+        ...     def add(self, description, result_fn, work_fn, priority=0):
+        ...         print(description)
+        >>> tmp = tempfile.TemporaryDirectory()
+        >>> path = os.path.join(tmp.name, "foo.rlvideo")
+        >>> with Project.new(path=path).new_transaction() as transaction:
+        ...     _ = transaction.add_text_clip("hello", length=10)
+        >>> _ = Project.new(background_worker=PrintingWorker(), path=path)
+        >>> _ = Project.load([path], background_worker=PrintingWorker())
+        Generating proxy for hello
+        """
         if args:
             if args[0].endswith(".rlvideo"):
                 path = args.pop(0)
@@ -59,8 +80,8 @@ class Project:
                 path = None
             project = Project.new(background_worker=background_worker, path=path)
             with project.new_transaction() as transaction:
-                for arg in args:
-                    transaction.add_clip(arg)
+                transaction.add_clips(args)
+            project.load_used_sources()
             return project
         else:
             return Project.with_test_clips(background_worker)
@@ -69,20 +90,22 @@ class Project:
     def with_test_clips(background_worker=None):
         project = Project.new(background_worker)
         with project.new_transaction() as transaction:
-            for i in range(int(os.environ.get("RLVIDEO_PERFORMANCE", "1"))):
-                offset = i*50
-                transaction.add_clip("resources/one-to-five.mp4")
-                transaction.add_clip("resources/one.mp4")
-                transaction.add_clip("resources/two.mp4")
-                transaction.add_clip("resources/three.mp4")
+            transaction.add_clips([
+                "resources/one-to-five.mp4",
+                "resources/one.mp4",
+                "resources/two.mp4",
+                "resources/three.mp4",
+            ]*int(os.environ.get("RLVIDEO_PERFORMANCE", "1")))
         return project
 
     def __init__(self, background_worker, path):
         self.producer_changed_event = Event()
         self.project_data_event = Event()
         self.profile = self.create_profile()
+        self.project_data = None
         self.set_project_data(ProjectData.load(path=path))
         self.proxy_spec = ProxySpec.from_path(path)
+        self.preview_profile = self.proxy_spec.adjust_profile(self.create_profile())
         self.proxy_source_loader = ProxySourceLoader(
             profile=self.profile,
             project=self,
@@ -92,6 +115,10 @@ class Project:
         self.background_worker = background_worker
         self.path = path
         self.current_transaction = None
+        self.saved_project_data = None
+
+    def load_used_sources(self):
+        self.proxy_source_loader.ensure_present(self.project_data.get_used_source_ids())
 
     def ripple_delete(self, cut_id):
         with self.new_transaction() as transaction:
@@ -102,14 +129,43 @@ class Project:
             transaction.split(cut_id, position)
 
     def save(self):
-        if self.path:
+        """
+        Project data is immutable, so if it is the same object as last time
+        it was saved, there is nothing new to write:
+
+        >>> tmp = tempfile.TemporaryDirectory()
+        >>> path = os.path.join(tmp.name, "foo.rlvideo")
+        >>> project = Project.new(path=path)
+        >>> project.save()
+        >>> os.remove(path)
+        >>> project.save()
+        >>> os.path.exists(path)
+        False
+        >>> with project.new_transaction() as transaction:
+        ...     _ = transaction.add_text_clip("hello", length=10)
+        >>> os.path.exists(path)
+        True
+        """
+        if self.path and self.project_data is not self.saved_project_data:
             tmp_path = self.path + ".tmp"
             self.project_data.write(tmp_path)
             os.rename(tmp_path, self.path)
+            self.saved_project_data = self.project_data
 
     def set_project_data(self, project_data):
-        self.project_data = project_data
-        self.project_data_event.trigger()
+        """
+        Listeners are only notified if the project data changes:
+
+        >>> project = Project.new()
+        >>> project.on_project_data(lambda: print("changed"))
+        changed
+        >>> project.set_project_data(project.project_data)
+        >>> project.set_project_data(ProjectData.empty())
+        changed
+        """
+        if project_data is not self.project_data:
+            self.project_data = project_data
+            self.project_data_event.trigger()
 
     def on_producer_changed(self, fn):
         self.producer_changed_event.listen(fn)
@@ -120,7 +176,12 @@ class Project:
         fn()
 
     def get_preview_profile(self):
-        return self.proxy_spec.adjust_profile(self.create_profile())
+        """
+        >>> project = Project.new()
+        >>> project.get_preview_profile() is project.get_preview_profile()
+        True
+        """
+        return self.preview_profile
 
     def create_profile(self):
         return mlt.Profile("uhd_2160p_25")
@@ -148,10 +209,14 @@ class Project:
             consumer = mlt.Consumer(self.profile, "avformat")
             consumer.set("target", path)
             consumer.connect(producer)
-            consumer.start()
-            while consumer.is_stopped() == 0:
-                progress(producer.position()/producer.get_playtime())
-                time.sleep(0.5)
+            stopped = start_consumer(consumer)
+            playtime = producer.get_playtime()
+            last_percent = None
+            while not stopped.wait(1):
+                percent = int(100*producer.position()/playtime)
+                if percent != last_percent:
+                    progress(percent/100)
+                    last_percent = percent
         self.background_worker.add(
             f"Exporting {path}",
             lambda result: None,
@@ -182,6 +247,21 @@ class Project:
         return self.current_transaction
 
     def split_into_sections(self):
+        """
+        Sections are cached by the immutable cuts, so they are only
+        recalculated when the cuts change:
+
+        >>> project = Project.new()
+        >>> with project.new_transaction() as transaction:
+        ...     cut_id = transaction.add_text_clip("hello", length=10)
+        >>> sections = project.split_into_sections()
+        >>> project.split_into_sections() is sections
+        True
+        >>> with project.new_transaction() as transaction:
+        ...     transaction.modify(cut_id, lambda cut: cut.move(1))
+        >>> project.split_into_sections() is sections
+        False
+        """
         return self.project_data.split_into_sections()
 
     @timeit("Project.get_preview_mlt_producer")
@@ -222,8 +302,18 @@ class ProjectData(namedtuple("ProjectData", "sources,cuts")):
             return ProjectData.empty()
 
     def write(self, path):
-        with open(path, "w") as f:
-            json.dump(self.to_json(), f)
+        with open(path, "wb") as f:
+            f.write(self.to_json_bytes())
+
+    def to_json_bytes(self):
+        """
+        >>> ProjectData.empty().to_json_bytes()
+        b'{"sources":{},"cuts":{}}'
+        """
+        if orjson is None:
+            return json.dumps(self.to_json(), separators=(",", ":")).encode("utf-8")
+        else:
+            return orjson.dumps(self.to_json())
 
     @staticmethod
     def from_json(json):
@@ -244,8 +334,10 @@ class ProjectData(namedtuple("ProjectData", "sources,cuts")):
     def cuts_end(self):
         return self.cuts.end
 
-    def add_source(self, source):
-        return self._replace(sources=self.sources.add(source))
+    def add_source(self, *sources):
+        if not sources:
+            return self
+        return self._replace(sources=self.sources.add(*sources))
 
     def add_cut(self, cut):
         """
@@ -259,7 +351,15 @@ class ProjectData(namedtuple("ProjectData", "sources,cuts")):
         ... ).get_cut("cut_a").in_out
         Region(start=0, end=5)
         """
-        return self._replace(cuts=self.cuts.add(self.adjust_cut_in_out(cut)))
+        return self.add_cuts(cut)
+
+    def add_cuts(self, *cuts):
+        if not cuts:
+            return self
+        return self._replace(cuts=self.cuts.add(*[
+            self.adjust_cut_in_out(cut)
+            for cut in cuts
+        ]))
 
     def modify_cut(self, cut_id, fn):
         """
@@ -298,14 +398,49 @@ class ProjectData(namedtuple("ProjectData", "sources,cuts")):
     def get_source_ids(self):
         return self.sources.get_ids()
 
+    def get_used_source_ids(self):
+        """
+        >>> data = ProjectData.empty()
+        >>> data = data.add_source(FileSource(id="source_a", path="a.mp4", length=5))
+        >>> data = data.add_source(FileSource(id="source_b", path="b.mp4", length=5))
+        >>> data = data.add_cut(Cut.test_instance(name="source_b", start=0, end=3, id="cut_b"))
+        >>> data.get_source_ids()
+        ['source_a', 'source_b']
+        >>> data.get_used_source_ids()
+        ['source_b']
+        """
+        return self.cuts.get_source_ids()
+
 class ExportSourceLoader:
 
     def __init__(self, profile, project):
         self.profile = profile
         self.project = project
+        self.mlt_producers = {}
+        self.space_producers = {}
 
     def get_source_mlt_producer(self, source_id):
-        return self.project.get_source(source_id).load(self.profile)
+        """
+        Each source is loaded once per export, even if many cuts use it:
+
+        >>> project = Project.new()
+        >>> with project.new_transaction() as transaction:
+        ...     _ = transaction.add_text_clip("hello", length=10, id="a")
+        >>> loader = ExportSourceLoader(profile=project.profile, project=project)
+        >>> loader.get_source_mlt_producer("a") is loader.get_source_mlt_producer("a")
+        True
+        """
+        if source_id not in self.mlt_producers:
+            self.mlt_producers[source_id] = self.project.get_source(source_id).load(self.profile)
+        return self.mlt_producers[source_id]
+
+    def get_section_mlt_producers(self, profile, sections):
+        return [section.to_mlt_producer(profile, self) for section in sections]
+
+    def get_space_mlt_producer(self, profile):
+        if profile not in self.space_producers:
+            self.space_producers[profile] = SpaceProducer(profile)
+        return self.space_producers[profile]
 
 class ProxySourceLoader:
 
@@ -314,42 +449,125 @@ class ProxySourceLoader:
         self.profile = profile
         self.background_worker = background_worker
         self.mlt_producers = {}
+        self.section_mlt_producers = {}
+        self.pending_source_ids = set()
         self.load_producer = LoadingProducer(self.profile)
+        self.space_producers = {}
         self.proxy_spec = proxy_spec
 
     def ensure_present(self, source_ids):
-        for source_id in list(self.mlt_producers.keys()):
-            if source_id not in source_ids:
-                # TODO: test removal
-                self.mlt_producers.pop(source_id)
-        for source_id in source_ids:
+        # TODO: test removal
+        for source_id in self.mlt_producers.keys() - set(source_ids):
+            self.mlt_producers.pop(source_id)
+            self.section_mlt_producers.clear()
+        for priority, source_id in enumerate(source_ids):
             if source_id not in self.mlt_producers:
-                self.load(source_id)
+                self.load(source_id, priority)
 
-    def load(self, source_id):
+    def load(self, source_id, priority=0):
+        source = self.project.get_source(source_id)
         def store(producer):
-            self.mlt_producers[source_id] = producer
-            self.project.producer_changed_event.trigger()
+            self.pending_source_ids.discard(source_id)
+            if source_id in self.mlt_producers:
+                self.mlt_producers[source_id] = producer
+                self.section_mlt_producers.clear()
+                self.project.producer_changed_event.trigger()
         def work(progress):
-            return self.project.get_source(source_id).load_proxy(
+            return source.load_proxy(
                 self.profile,
                 self.proxy_spec,
                 progress
             )
         self.mlt_producers[source_id] = self.load_producer
+        if source_id in self.pending_source_ids:
+            return
+        self.pending_source_ids.add(source_id)
         self.background_worker.add(
-            f"Generating proxy for {self.project.get_source(source_id).get_label()}",
+            f"Generating proxy for {source.get_label()}",
             store,
-            work
+            work,
+            priority
         )
 
     def get_source_mlt_producer(self, source_id):
-        return self.mlt_producers[source_id]
+        return self.mlt_producers.get(source_id, self.load_producer)
+
+    def get_space_mlt_producer(self, profile):
+        """
+        One space producer is created per profile:
+
+        >>> project = Project.new()
+        >>> loader = project.proxy_source_loader
+        >>> space = loader.get_space_mlt_producer(project.profile)
+        >>> loader.get_space_mlt_producer(project.profile) is space
+        True
+        >>> loader.get_space_mlt_producer(project.preview_profile) is space
+        False
+        """
+        if profile not in self.space_producers:
+            self.space_producers[profile] = SpaceProducer(profile)
+        return self.space_producers[profile]
+
+    def get_section_mlt_producers(self, profile, sections):
+        """
+        Producers for sections that did not change since the last call are
+        reused:
+
+        >>> project = Project.new()
+        >>> with project.new_transaction() as transaction:
+        ...     _ = transaction.add_text_clip("hello", length=10)
+        ...     overlap_id = transaction.add_text_clip("world", length=10)
+        ...     end_id = transaction.add_text_clip("end", length=10)
+        >>> with project.new_transaction() as transaction:
+        ...     transaction.modify(overlap_id, lambda cut: cut.move(-5))
+        >>> loader = project.proxy_source_loader
+        >>> first = loader.get_section_mlt_producers(
+        ...     project.profile,
+        ...     project.split_into_sections().sections
+        ... )
+        >>> len(first)
+        3
+        >>> second = loader.get_section_mlt_producers(
+        ...     project.profile,
+        ...     project.split_into_sections().sections
+        ... )
+        >>> [a is b for a, b in zip(first, second)]
+        [True, True, True]
+
+        Editing a cut in the last section only creates a new producer for
+        that section, and the producer for the old section is dropped:
+
+        >>> with project.new_transaction() as transaction:
+        ...     transaction.modify(end_id, lambda cut: cut.move(5))
+        >>> third = loader.get_section_mlt_producers(
+        ...     project.profile,
+        ...     project.split_into_sections().sections
+        ... )
+        >>> [a is b for a, b in zip(first, third)]
+        [True, True, False]
+        >>> len(loader.section_mlt_producers)
+        3
+        >>> any(producer is first[2] for producer in loader.section_mlt_producers.values())
+        False
+        """
+        previous = self.section_mlt_producers
+        self.section_mlt_producers = {}
+        producers = []
+        for section in sections:
+            key = (profile, section.get_key())
+            producer = previous.get(key)
+            if producer is None:
+                producer = section.to_mlt_producer(profile, self)
+            self.section_mlt_producers[key] = producer
+            producers.append(producer)
+        return producers
 
 class Transaction:
 
     # TODO: support slowdown of clip and make sure it works with proxies
 
+    __slots__ = ["project", "initial_data"]
+
     def __init__(self, project):
         self.project = project
         self.initial_data = self.project.project_data
@@ -374,10 +592,34 @@ class Transaction:
             self.reset()
 
     def commit(self):
+        """
+        Nothing needs to be updated if the transaction did not change
+        anything:
+
+        >>> project = Project.new()
+        >>> project.on_producer_changed(lambda: print("producer changed"))
+        producer changed
+        >>> with project.new_transaction() as transaction:
+        ...     pass
+        >>> with project.new_transaction() as transaction:
+        ...     _ = transaction.add_text_clip("hello", length=10)
+        producer changed
+        producer changed
+
+        The project is still saved, so that a new project file is created even
+        if nothing was added to it:
+
+        >>> tmp = tempfile.TemporaryDirectory()
+        >>> path = os.path.join(tmp.name, "new.rlvideo")
+        >>> project = Project.load([path])
+        >>> os.path.exists(path)
+        True
+        """
         with self.cleanup():
-            # TODO: retrieval of proxy clip will not work within transaction
-            self.project.proxy_source_loader.ensure_present(self.project.project_data.get_source_ids())
-            self.project.producer_changed_event.trigger()
+            if self.project.project_data is not self.initial_data:
+                # TODO: retrieval of proxy clip will not work within transaction
+                self.project.load_used_sources()
+                self.project.producer_changed_event.trigger()
             self.project.save()
 
     def reset(self):
@@ -402,22 +644,67 @@ class Transaction:
         self.project.set_project_data(self.project.project_data.modify_cut(cut_id, fn))
 
     def add_clip(self, path, id=None):
-        source = FileSource(
+        source = self.create_file_source(path, id)
+        return self.add_source(source, source.length)
+
+    def add_clips(self, paths):
+        sources = [self.create_file_source(path) for path in paths]
+        return self.add_sources([(source, source.length) for source in sources])
+
+    def create_file_source(self, path, id=None):
+        return FileSource(
             id=id,
             path=path,
             length=Clip(
                 path
             ).calculate_length_at_fps(mlt_profile=self.project.profile)
         )
-        return self.add_source(source, source.length)
 
     def add_text_clip(self, text, length, id=None):
         return self.add_source(TextSource(id=id, text=text), length)
 
     def add_source(self, source, length):
-        if source.id is None:
-            source = source.with_unique_id()
-        self.project.set_project_data(self.project.project_data.add_source(source))
-        cut = source.create_cut(0, length).move(self.project.project_data.cuts_end)
-        self.project.set_project_data(self.project.project_data.add_cut(cut))
-        return cut.id
+        [cut_id] = self.add_sources([(source, length)])
+        return cut_id
+
+    def add_sources(self, sources_with_lengths):
+        """
+        All sources are added in one step with their cuts placed after each
+        other at the end:
+
+        >>> project = Project.new()
+        >>> with project.new_transaction() as transaction:
+        ...     _ = transaction.add_text_clip("hello", length=3, id="a")
+        ...     _ = transaction.add_sources([
+        ...         (TextSource(id="b", text="B"), 4),
+        ...         (TextSource(id="c", text="C"), 5),
+        ...     ])
+        >>> [(cut.get_source_id(), cut.start, cut.end) for cut in project.project_data.cuts.sorted_cuts]
+        [('a', 0, 3), ('b', 3, 7), ('c', 7, 12)]
+
+        Adding nothing keeps the project data unchanged:
+
+        >>> project_data = project.project_data
+        >>> with project.new_transaction() as transaction:
+        ...     transaction.add_clips([])
+        []
+        >>> project.project_data is project_data
+        True
+        """
+        if not sources_with_lengths:
+            return []
+        project_data = self.project.project_data
+        sources = []
+        cuts = []
+        position = project_data.cuts_end
+        for source, length in sources_with_lengths:
+            if source.id is None:
+                source = source.with_unique_id()
+            cut = source.create_cut(0, length).move(position)
+            position = cut.end
+            sources.append(source)
+            cuts.append(cut)
+        self.project.set_project_data(
+            project_data.add_source(*sources).add_cuts(*cuts)
+        )
+        return [cut.id for cut in cuts]
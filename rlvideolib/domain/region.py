@@ -38,18 +38,24 @@ class Region(namedtuple("Region", "start,end")):
     def get_groups(self, group_size):
         """
         >>> Region(start=0, end=1).get_groups(1)
-        {0}
+        range(0, 1)
 
         >>> Region(start=0, end=5).get_groups(1)
-        {0, 1, 2, 3, 4}
+        range(0, 5)
 
         >>> Region(start=0, end=6).get_groups(2)
-        {0, 1, 2}
+        range(0, 3)
 
         >>> Region(start=0, end=7).get_groups(2)
-        {0, 1, 2, 3}
+        range(0, 4)
+
+        Groups are a range, so checking membership does not depend on how many
+        groups the region spans:
+
+        >>> 2 in Region(start=0, end=7).get_groups(2)
+        True
         """
-        return set(range(self.start//group_size, ((self.end-1)//group_size)+1))
+        return range(self.start//group_size, ((self.end-1)//group_size)+1)
 
     def union(self, region):
         """
@@ -147,7 +153,24 @@ class UnionRegions:
         self.regions = []
 
     def add(self, region):
-        self.regions.append(region)
+        """
+        Regions added in start order are merged as they are added:
+
+        >>> r = UnionRegions()
+        >>> r.add(Region(start=0, end=10))
+        >>> r.add(Region(start=5, end=15))
+        >>> r.add(Region(start=20, end=25))
+        >>> r.regions
+        [Region(start=0, end=15), Region(start=20, end=25)]
+
+        >>> r.add(Region(start=16, end=17))
+        >>> list(r)
+        [Region(start=0, end=15), Region(start=16, end=17), Region(start=20, end=25)]
+        """
+        if self.regions and region.start >= self.regions[-1].start:
+            self.regions.extend(self.regions.pop(-1).union(region))
+        else:
+            self.regions.append(region)
 
     def __iter__(self):
         """
@@ -156,13 +179,20 @@ class UnionRegions:
         >>> r.add(Region(start=5, end=10))
         >>> list(r)
         [Region(start=0, end=100)]
+
+        >>> r = UnionRegions()
+        >>> r.add(Region(start=20, end=30))
+        >>> r.add(Region(start=0, end=10))
+        >>> r.add(Region(start=10, end=15))
+        >>> r.add(Region(start=12, end=25))
+        >>> list(r)
+        [Region(start=0, end=30)]
         """
         merged = []
-        rest = sorted(self.regions, key=lambda region: region.start)
-        while rest:
-            region = rest.pop(0)
-            if merged:
-                merged.extend(merged.pop(-1).union(region))
+        for region in sorted(self.regions, key=lambda region: region.start):
+            if merged and region.start <= merged[-1].end:
+                if region.end > merged[-1].end:
+                    merged[-1] = merged[-1]._replace(end=region.end)
             else:
                 merged.append(region)
         return iter(merged)
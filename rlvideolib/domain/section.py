@@ -1,3 +1,5 @@
+import bisect
+
 import mlt
 
 from rlvideolib.asciicanvas import AsciiCanvas
@@ -8,15 +10,18 @@ from rlvideolib.mlthelpers import MltInconsistencyError
 
 class Sections:
 
+    __slots__ = ["sections", "offsets", "length"]
+
     def __init__(self):
         self.sections = []
-
-    @property
-    def length(self):
-        return sum(section.length for section in self.sections)
+        self.offsets = []
+        self.length = 0
 
     def add(self, *sections):
-        self.sections.extend(sections)
+        for section in sections:
+            self.sections.append(section)
+            self.offsets.append(self.length)
+            self.length += section.length
 
     def to_ascii_canvas(self):
         canvas = AsciiCanvas()
@@ -28,15 +33,15 @@ class Sections:
                 lines.append(canvas.get_max_x()+1)
                 offset += 1
                 offset += section.length
+            height = canvas.get_max_y()+1
             for line in lines:
-                for y in range(canvas.get_max_y()+1):
-                    canvas.add_text("|", line, y)
+                canvas.add_vertical_line("|", line, height)
         return canvas
 
     def to_mlt_producer(self, profile, cache):
         playlist = mlt.Playlist(profile)
-        for section in self.sections:
-            playlist.append(section.to_mlt_producer(profile, cache))
+        for producer in cache.get_section_mlt_producers(profile, self.sections):
+            playlist.append(producer)
         assert playlist.get_playtime() == self.length
         return playlist
 
@@ -46,22 +51,32 @@ class Sections:
         return boxes
 
     def collect_cut_boxes(self, region, boxes, rectangle, pos):
-        for section, section_rectangle in rectangle.divide_width(
+        collect_cut_boxes_side_by_side(
             self.sections,
-            lambda section: section.length
-        ):
-            if pos >= region.end:
-                return
-            elif pos + section.length > region.start:
-                section.collect_cut_boxes(region, boxes, section_rectangle, pos)
-            pos += section.length
+            self.offsets,
+            self.length,
+            region,
+            boxes,
+            rectangle,
+            pos
+        )
 
 class PlaylistSection:
 
+    __slots__ = ["length", "parts", "offsets"]
+
     def __init__(self, length, parts):
         assert length == sum(part.length for part in parts)
         self.length = length
         self.parts = parts
+        self.offsets = []
+        offset = 0
+        for part in parts:
+            self.offsets.append(offset)
+            offset += part.length
+
+    def get_key(self):
+        return ("playlist", tuple(self.parts))
 
     def to_ascii_canvas(self):
         canvas = AsciiCanvas()
@@ -85,24 +100,29 @@ class PlaylistSection:
         return playlist
 
     def collect_cut_boxes(self, region, boxes, rectangle, pos):
-        for part, part_rectangle in rectangle.divide_width(
+        collect_cut_boxes_side_by_side(
             self.parts,
-            lambda part: part.length
-        ):
-            if pos >= region.end:
-                return
-            elif pos + part.length > region.start:
-                part.collect_cut_boxes(region, boxes, part_rectangle, pos)
-            pos += part.length
+            self.offsets,
+            self.length,
+            region,
+            boxes,
+            rectangle,
+            pos
+        )
 
 class MixSection:
 
+    __slots__ = ["length", "playlists"]
+
     def __init__(self, length, playlists):
         for playlist in playlists:
             assert playlist.length == length
         self.length = length
         self.playlists = playlists
 
+    def get_key(self):
+        return ("mix", tuple(playlist.get_key() for playlist in self.playlists))
+
     def to_ascii_canvas(self):
         canvas = AsciiCanvas()
         for y, playlist in enumerate(self.playlists):
@@ -187,3 +207,36 @@ class MixSection:
             lambda playlist: playlist.length
         ):
             playlist.collect_cut_boxes(region, boxes, playlist_rectangle, pos)
+
+def collect_cut_boxes_side_by_side(items, offsets, length, region, boxes, rectangle, pos):
+    """
+    Each item's position and rectangle is calculated from its offset, so items
+    narrower than a pixel do not shift the items after them:
+
+    >>> class Item:
+    ...     def __init__(self, name, length):
+    ...         self.name = name
+    ...         self.length = length
+    ...     def collect_cut_boxes(self, region, boxes, rectangle, pos):
+    ...         boxes[self.name] = (pos, rectangle.x, rectangle.width)
+    >>> sections = Sections()
+    >>> sections.add(Item("a", 1), Item("b", 98), Item("c", 1), Item("d", 100))
+    >>> sections.to_cut_boxes(Region(start=50, end=200), Rectangle.from_size(20, 10))
+    {'b': (1, 0, 10), 'd': (100, 10, 10)}
+
+    Items before the region are skipped with a binary search on the offsets:
+
+    >>> sections.to_cut_boxes(Region(start=150, end=200), Rectangle.from_size(20, 10))
+    {'d': (100, 10, 10)}
+    """
+    first_visible = max(0, bisect.bisect_right(offsets, region.start-pos)-1)
+    for index in range(first_visible, len(items)):
+        item = items[index]
+        offset = offsets[index]
+        item_pos = pos + offset
+        if item_pos >= region.end:
+            return
+        elif item_pos + item.length > region.start:
+            item_rectangle = rectangle.slice_width(offset, offset+item.length, length)
+            if item_rectangle is not None:
+                item.collect_cut_boxes(region, boxes, item_rectangle, item_pos)
@@ -146,10 +146,10 @@ class Sources(namedtuple("Sources", "id_to_source")):
 
     @staticmethod
     def from_json(json):
-        sources = Sources.empty()
-        for id, json in json.items():
-            sources = sources.add(Source.from_json(id, json))
-        return sources
+        return Sources.empty().add(*[
+            Source.from_json(id, json)
+            for id, json in json.items()
+        ])
 
     def to_json(self):
         json = {}
@@ -160,11 +160,30 @@ class Sources(namedtuple("Sources", "id_to_source")):
     def get_ids(self):
         return list(self.id_to_source.keys())
 
-    def add(self, source):
-        if source.id in self.id_to_source:
-            raise ValueError(f"Source with id {source.id} already exists.")
+    def add(self, *sources):
+        """
+        >>> sources = Sources.empty().add(
+        ...     TextSource(id="a", text="A"),
+        ...     TextSource(id="b", text="B"),
+        ... )
+        >>> sources.get_ids()
+        ['a', 'b']
+
+        >>> sources.add(TextSource(id="a", text="A"))
+        Traceback (most recent call last):
+          ...
+        ValueError: Source with id a already exists.
+
+        >>> sources.add() is sources
+        True
+        """
+        if not sources:
+            return self
         new = dict(self.id_to_source)
-        new[source.id] = source
+        for source in sources:
+            if source.id in new:
+                raise ValueError(f"Source with id {source.id} already exists.")
+            new[source.id] = source
         return self._replace(id_to_source=new)
 
     def get(self, id):
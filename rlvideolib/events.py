@@ -10,12 +10,16 @@ class Event:
     got event
     """
 
+    __slots__ = ["listeners"]
+
     def __init__(self):
-        self.listeners = []
+        # A tuple, so listeners added during a trigger are not called until
+        # the next trigger.
+        self.listeners = ()
 
     def trigger(self):
         for fn in self.listeners:
             fn()
 
     def listen(self, fn):
-        self.listeners.append(fn)
+        self.listeners += (fn,)
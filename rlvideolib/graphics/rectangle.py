@@ -143,6 +143,28 @@ class Rectangle(namedtuple("Rectangle", "x,y,width,height")):
                 yield item, self._replace(x=self.x+offset, width=distance)
                 offset += distance
 
+    def slice_width(self, start, end, total):
+        """
+        Return the part of this rectangle that start-end covers if the whole
+        width covers total. Slices of consecutive ranges line up exactly with
+        the rectangles from divide_width:
+
+        >>> rectangle = Rectangle.from_size(10, 5)
+        >>> [r for item, r in rectangle.divide_width([3, 3, 3], lambda item: item)]
+        [Rectangle(x=0, y=0, width=3, height=5), Rectangle(x=3, y=0, width=4, height=5), Rectangle(x=7, y=0, width=3, height=5)]
+        >>> [rectangle.slice_width(start, start+3, 9) for start in [0, 3, 6]]
+        [Rectangle(x=0, y=0, width=3, height=5), Rectangle(x=3, y=0, width=4, height=5), Rectangle(x=7, y=0, width=3, height=5)]
+
+        Slices narrower than a pixel are None:
+
+        >>> rectangle.slice_width(0, 1, 100) is None
+        True
+        """
+        x_start = int(round((start/total)*self.width))
+        x_end = int(round((end/total)*self.width))
+        if x_end > x_start:
+            return self._replace(x=self.x+x_start, width=x_end-x_start)
+
     def divide_height(self, items, fn):
         offset = 0
         for item, distance in Distance(self.height).divide(items, fn):
@@ -193,14 +215,12 @@ class Distance(namedtuple("Distance", "distance")):
         >>> list(Distance(10).divide("abc", lambda item: 3))
         [('a', 3), ('b', 4), ('c', 3)]
         """
-        total_size = sum(size_fn(item) for item in items)
+        sizes = [size_fn(item) for item in items]
+        total_size = sum(sizes)
         size_so_far = 0
         start = 0
-        for item in items:
-            item_pos = int(round((
-                (size_so_far+size_fn(item)) / total_size) * self.distance
-            ))
-            item_distance = item_pos-start
-            size_so_far += size_fn(item)
-            yield (item, item_distance)
-            start += item_distance
+        for item, size in zip(items, sizes):
+            size_so_far += size
+            item_pos = int(round((size_so_far / total_size) * self.distance))
+            yield (item, item_pos-start)
+            start = item_pos
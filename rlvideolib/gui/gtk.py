@@ -13,6 +13,7 @@ from rlvideolib.gui.framework import RectangleMap
 from rlvideolib.gui.generic import GUI_SPACING
 from rlvideolib.gui.generic import Timeline
 from rlvideolib.jobs import BackgroundWorker
+from rlvideolib.mlthelpers import start_consumer
 
 class GtkGui:
 
@@ -66,9 +67,7 @@ class App:
             consumer = mlt.Consumer(project.profile, "xml")
             consumer.set("resource", path)
             consumer.connect(project.get_preview_mlt_producer())
-            consumer.start()
-            while consumer.is_stopped() == 0:
-                time.sleep(0.5)
+            start_consumer(consumer).wait()
             print("Done")
             return
 
@@ -178,7 +177,8 @@ class MltPlayer:
         self.consumer = mlt.Consumer(self.project.get_preview_profile(), "sdl")
         self.consumer.start()
         self.producer = None
-        self.project.on_producer_changed(self.update_producer)
+        self.update_producer_scheduled = False
+        self.project.on_producer_changed(self.producer_changed)
 
     def position(self):
         # TODO: why is this position on the producer and not the consumer?
@@ -209,6 +209,21 @@ class MltPlayer:
         print("Seek 0")
         self.producer.seek(0)
 
+    def producer_changed(self):
+        # Many changes can happen before the main loop is idle (for example
+        # when several proxies finish). Rebuild the producer only once for
+        # all of them.
+        if self.producer is None:
+            self.update_producer()
+        elif not self.update_producer_scheduled:
+            self.update_producer_scheduled = True
+            GLib.idle_add(self.scheduled_update_producer)
+
+    def scheduled_update_producer(self):
+        self.update_producer_scheduled = False
+        self.update_producer()
+        return False # To only schedule it once
+
     def update_producer(self):
         # TODO: creating the producer here sometimes yield a segfault
         #
@@ -1,8 +1,10 @@
+import heapq
+import itertools
 import threading
 
 class NonThreadedBackgroundWorker:
 
-    def add(self, description, result_fn, work_fn):
+    def add(self, description, result_fn, work_fn, priority=0):
         result_fn(work_fn(lambda progress: None))
 
 class BackgroundWorker:
@@ -54,18 +56,47 @@ class BackgroundWorker:
     STATUS = sub (50%) | 0 jobs pending
     RESULT = -1
     STATUS = Ready
+
+    Pending jobs with a lower priority run first:
+
+    >>> worker.add("first", on_result, lambda progress: "first")
+    STATUS = first | 0 jobs pending
+
+    >>> worker.add("late", on_result, lambda progress: "late", priority=10)
+    STATUS = first | 1 jobs pending
+
+    >>> worker.add("early", on_result, lambda progress: "early", priority=1)
+    STATUS = first | 2 jobs pending
+
+    >>> mock_threading.run_one()
+    RESULT = first
+    STATUS = early | 1 jobs pending
+
+    >>> mock_threading.run_one()
+    RESULT = early
+    STATUS = late | 0 jobs pending
+
+    >>> mock_threading.run_one()
+    RESULT = late
+    STATUS = Ready
     """
 
     def __init__(self, display_status, on_main_thread_fn, threading=threading):
         self.threading = threading
         self.display_status = display_status
         self.jobs = []
+        self.job_counter = itertools.count()
         self.current_job = None
         self.on_main_thread_fn = on_main_thread_fn
         self.on_jobs_changed()
 
-    def add(self, description, result_fn, work_fn):
-        self.jobs.append(Job(description, result_fn, work_fn))
+    def add(self, description, result_fn, work_fn, priority=0):
+        # Among jobs with equal priority, the most recently added runs first.
+        heapq.heappush(self.jobs, (
+            priority,
+            -next(self.job_counter),
+            Job(description, result_fn, work_fn)
+        ))
         self.on_jobs_changed()
 
     def on_jobs_changed(self):
@@ -96,7 +127,7 @@ class BackgroundWorker:
                 self.on_jobs_changed()
             self.on_main_thread_fn(foo)
         if self.jobs:
-            job = self.jobs.pop(-1)
+            _, _, job = heapq.heappop(self.jobs)
             thread = self.threading.Thread(target=worker)
             thread.daemon = True
             thread.start()
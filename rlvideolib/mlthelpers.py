@@ -1,3 +1,5 @@
+import threading
+
 import mlt
 
 class LoadingProducer(mlt.Producer):
@@ -15,6 +17,9 @@ class LoadingProducer(mlt.Producer):
         self.set("length", max_out+1)
         return mlt.Producer.cut(self, in_, out)
 
+def SpaceProducer(profile):
+    return mlt.Producer(profile, "color:#00000000") # transparent
+
 def TimewarpProducer(profile, producer, speed):
     if speed != 1 and not isinstance(producer, LoadingProducer):
         old_path = producer.get('resource')
@@ -31,3 +36,33 @@ class MltInconsistencyError(Exception):
                 f"Invalid producer: {arg!r}."
             )
         return producer
+
+def start_consumer(consumer):
+    """
+    Start the consumer and return a threading.Event that is set once the
+    consumer has stopped.
+
+    A helper thread polls is_stopped instead of blocking in a native MLT
+    call, so that the GIL is released between polls:
+
+    >>> class FakeConsumer:
+    ...     def __init__(self):
+    ...         self.polls = 0
+    ...     def start(self):
+    ...         pass
+    ...     def is_stopped(self):
+    ...         self.polls += 1
+    ...         return int(self.polls > 2)
+    >>> start_consumer(FakeConsumer()).wait(5)
+    True
+    """
+    stopped = threading.Event()
+    def poll():
+        while consumer.is_stopped() == 0:
+            stopped.wait(0.5)
+        stopped.set()
+    consumer.start()
+    thread = threading.Thread(target=poll)
+    thread.daemon = True
+    thread.start()
+    return stopped